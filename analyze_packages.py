@@ -7,11 +7,22 @@ using them in DependencyTrack.
 import csv
 import os
 import sys
+import threading
 import requests
 import json
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter, Retry
 from typing import Dict, List, Tuple
 from urllib.parse import urljoin
 
+# orjson is considerably faster than stdlib json on the large paginated
+# payloads we parse; fall back to stdlib when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # DependencyTrack API base URL
 DT_BASE_URL = os.getenv("DT_BASE_URL")
 DT_API_TOKEN = os.getenv("DT_API_TOKEN")
@@ -27,6 +38,12 @@ if not DT_API_TOKEN:
 # Cache control - disabled by default
 ENABLE_CACHE = os.getenv("ENABLE_CACHE", "").lower() in ("true", "1", "yes")
 
+# Server-side matching - disabled by default. Queries the identity API once
+# per malicious package instead of fetching every component of every project,
+# transferring only the (rare) matches instead of whole SBOMs. DependencyTrack
+# name search is a SQL LIKE, so results are re-filtered on exact name here.
+SERVER_SIDE_MATCHING = os.getenv("SERVER_SIDE_MATCHING", "").lower() in ("true", "1", "yes")
+
 # CSV URL
 CSV_URL = "https://github.com/wiz-sec-public/wiz-research-iocs/raw/refs/heads/main/reports/shai-hulud-2-packages.csv"
 
@@ -39,16 +56,83 @@ HEADERS = {
     "Content-Type": "application/json"
 }
 
+# Number of concurrent component fetches (the work is network-bound)
+MAX_FETCH_WORKERS = 16
+
+# Use /app/output if it exists (Docker volume mount), otherwise current
+# directory - resolved once here instead of stat()ing on every save
+OUTPUT_DIR = '/app/output' if os.path.exists('/app/output') else '.'
+CACHE_FILE = os.path.join(OUTPUT_DIR, 'cache.json')
+
+# Shared session for all DependencyTrack calls: reuses TCP/TLS connections
+# across the paginated requests instead of handshaking on every call
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.headers['Accept-Encoding'] = 'gzip'
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+
+# Guards cache writes from the fetch worker threads
+_CACHE_LOCK = threading.Lock()
+
+# Just the fields the per-component match needs, as an immutable record:
+# attribute access is cheaper than dict lookups in the hot loop, and the
+# presentation-only fields live separately in packages_meta
+PkgMatch = namedtuple('PkgMatch', ['major_version', 'all_versions_malicious', 'malicious_versions_set'])
+
+# Set when a project is added to the cache; lets save_cache skip the
+# (potentially tens of MB) rewrite when nothing changed since last save
+_cache_dirty = False
+
+# Per-package result record: packages number in the thousands and a
+# fixed-slot tuple is far cheaper than an 8-key dict each. Converted to
+# the documented dict form only at serialization time in save_results.
+# The exact/major buckets are None when empty (and omitted from output).
+PackageDetail = namedtuple('PackageDetail', [
+    'package', 'version', 'major_version', 'malicious_versions',
+    'all_versions_malicious', 'source', 'projects_any_version',
+    'projects_exact_version', 'projects_major_version'
+])
+
+# Default for reading a PackageDetail's exact/major bucket when it is None
+_EMPTY_BUCKET = {'count': 0, 'projects': []}
+
+
+def _json_loads(data: bytes):
+    """Parse JSON from bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize to indented JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+
+def _jsonl_dumps(obj) -> bytes:
+    """Serialize one compact, newline-terminated JSONL record."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj) + '\n').encode()
+
 
 def download_csv(url: str) -> List[Dict[str, str]]:
     """Download and parse the CSV file."""
     print(f"Downloading CSV from {url}...")
-    response = requests.get(url, timeout=30)
+    response = requests.get(url, timeout=30, stream=True)
     response.raise_for_status()
 
-    # Parse CSV
-    csv_content = response.text
-    reader = csv.DictReader(csv_content.splitlines())
+    # Parse CSV straight off the streamed lines, avoiding the full-text
+    # decode plus splitlines() list that the old code materialized
+    reader = csv.DictReader(line for line in response.iter_lines(decode_unicode=True) if line)
     packages = list(reader)
     print(f"Downloaded {len(packages)} packages from CSV")
     return packages
@@ -60,7 +144,7 @@ def download_json(url: str) -> Dict:
     response = requests.get(url, timeout=30)
     response.raise_for_status()
 
-    data = response.json()
+    data = _json_loads(response.content)
     print(f"Downloaded {len(data)} packages from JSON")
     return data
 
@@ -101,13 +185,13 @@ def get_all_projects() -> List[Dict]:
     """Get all projects from DependencyTrack, handling pagination."""
     base_url = urljoin(DT_BASE_URL, "/api/v1/project")
     all_projects = []
-    page_size = 100
+    page_size = 1000
     page_number = 1
 
     try:
         # First request to get total count
         params = {'pageNumber': str(page_number), 'pageSize': str(page_size)}
-        response = requests.get(base_url, headers=HEADERS, params=params, timeout=30)
+        response = SESSION.get(base_url, params=params, timeout=30)
         check_and_exit_on_error(response, "getting projects")
         response.raise_for_status()
 
@@ -123,8 +207,8 @@ def get_all_projects() -> List[Dict]:
 
         # Process first page
         try:
-            data = response.json()
-        except json.JSONDecodeError:
+            data = _json_loads(response.content)
+        except ValueError:
             print(f"Non-JSON response when getting projects: {response.text[:200]}", file=sys.stderr)
             return []
 
@@ -142,13 +226,13 @@ def get_all_projects() -> List[Dict]:
             # Fetch remaining pages
             for page_number in range(2, total_pages + 1):
                 params = {'pageNumber': str(page_number), 'pageSize': str(page_size)}
-                response = requests.get(base_url, headers=HEADERS, params=params, timeout=30)
+                response = SESSION.get(base_url, params=params, timeout=30)
                 check_and_exit_on_error(response, f"getting projects page {page_number}")
                 response.raise_for_status()
 
                 try:
-                    data = response.json()
-                except json.JSONDecodeError:
+                    data = _json_loads(response.content)
+                except ValueError:
                     print(f"Non-JSON response when getting projects page {page_number}: {response.text[:200]}", file=sys.stderr)
                     continue
 
@@ -167,13 +251,13 @@ def get_all_projects() -> List[Dict]:
                 while True:
                     page_number += 1
                     params = {'pageNumber': str(page_number), 'pageSize': str(page_size)}
-                    response = requests.get(base_url, headers=HEADERS, params=params, timeout=30)
+                    response = SESSION.get(base_url, params=params, timeout=30)
                     check_and_exit_on_error(response, f"getting projects page {page_number}")
                     response.raise_for_status()
 
                     try:
-                        data = response.json()
-                    except json.JSONDecodeError:
+                        data = _json_loads(response.content)
+                    except ValueError:
                         print(f"Non-JSON response when getting projects page {page_number}: {response.text[:200]}", file=sys.stderr)
                         break
 
@@ -197,41 +281,60 @@ def get_all_projects() -> List[Dict]:
         print(f"Error getting projects: {e}", file=sys.stderr)
         return []
 
-def load_cache() -> Dict[str, List[Dict]]:
+def load_cache() -> Dict[str, List]:
     """Load component cache from cache.json if it exists and caching is enabled."""
     if not ENABLE_CACHE:
         return {}
-    # Use /app/output if it exists (Docker volume mount), otherwise current directory
-    output_dir = '/app/output' if os.path.exists('/app/output') else '.'
-    cache_file = os.path.join(output_dir, 'cache.json')
-    if os.path.exists(cache_file):
+    if os.path.exists(CACHE_FILE):
         try:
-            with open(cache_file, 'r') as f:
-                cache = json.load(f)
+            with open(CACHE_FILE, 'rb') as f:
+                cache = _json_loads(f.read())
+                # Older caches stored full component dicts; discard those so
+                # the slim (name, version) format gets rebuilt
+                for components in cache.values():
+                    if components:
+                        if isinstance(components[0], dict):
+                            print("Cache file uses the old full-component format. Starting with empty cache.")
+                            return {}
+                        break
                 print(f"Loaded cache with {len(cache)} projects")
                 return cache
-        except (json.JSONDecodeError, IOError) as e:
+        except (ValueError, IOError) as e:
             print(f"Error loading cache: {e}. Starting with empty cache.")
             return {}
     return {}
 
 
-def save_cache(cache: Dict[str, List[Dict]]):
-    """Save component cache to cache.json if caching is enabled."""
+def save_cache(cache: Dict[str, List]):
+    """Save component cache to cache.json if caching is enabled and changed."""
+    global _cache_dirty
     if not ENABLE_CACHE:
         return
-    # Use /app/output if it exists (Docker volume mount), otherwise current directory
-    output_dir = '/app/output' if os.path.exists('/app/output') else '.'
-    cache_file = os.path.join(output_dir, 'cache.json')
+    if not _cache_dirty:
+        return
+    # Snapshot under the lock so fetch workers can keep adding entries while we write
+    with _CACHE_LOCK:
+        snapshot = dict(cache)
+        _cache_dirty = False
     try:
-        with open(cache_file, 'w') as f:
-            json.dump(cache, f, indent=2)
-    except IOError as e:
+        # Write to a temp file and rename so a crash mid-write can't corrupt the cache
+        tmp_file = CACHE_FILE + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(_json_dumps(snapshot))
+        os.replace(tmp_file, CACHE_FILE)
+    except (IOError, OSError) as e:
         print(f"Error saving cache: {e}", file=sys.stderr)
 
 
-def get_project_components(project_uuid: str, cache: Dict[str, List[Dict]] = None) -> List[Dict]:
-    """Get all components for a project, handling pagination and using cache if available and enabled."""
+def get_project_components(project_uuid: str, cache: Dict[str, List] = None) -> List[Tuple[str, str]]:
+    """
+    Get all (name, version) component pairs for a project, handling pagination
+    and using cache if available and enabled.
+
+    Only name and version are kept: the analysis reads nothing else, and the
+    full component dicts bloated the cache file by an order of magnitude.
+    """
+    global _cache_dirty
     # Check cache first (only if caching is enabled)
     if ENABLE_CACHE and cache is not None and project_uuid in cache:
         return cache[project_uuid]
@@ -239,19 +342,35 @@ def get_project_components(project_uuid: str, cache: Dict[str, List[Dict]] = Non
     # Fetch from API with pagination
     base_url = urljoin(DT_BASE_URL, f"/api/v1/component/project/{project_uuid}")
     all_components = []
-    page_size = 100
+    page_size = 1000
     page_number = 1
 
     try:
+        # Cheap HEAD probe first: many projects have no components at all,
+        # and the X-Total-Count header lets us skip the body fetch entirely
+        try:
+            head = SESSION.head(base_url, params={'pageSize': '1'}, timeout=30)
+            if head.ok and head.headers.get('X-Total-Count') == '0':
+                components = []
+                if ENABLE_CACHE and cache is not None:
+                    with _CACHE_LOCK:
+                        cache[project_uuid] = components
+                        _cache_dirty = True
+                return components
+        except requests.exceptions.RequestException:
+            pass  # fall through to the normal GET
+
         # First request to get total count
         params = {'pageNumber': str(page_number), 'pageSize': str(page_size)}
-        response = requests.get(base_url, headers=HEADERS, params=params, timeout=30)
+        response = SESSION.get(base_url, params=params, timeout=30)
         check_and_exit_on_error(response, f"getting components for project {project_uuid}")
 
         if response.status_code == 404:
             components = []
             if ENABLE_CACHE and cache is not None:
-                cache[project_uuid] = components
+                with _CACHE_LOCK:
+                    cache[project_uuid] = components
+                    _cache_dirty = True
             return components
 
         response.raise_for_status()
@@ -268,8 +387,8 @@ def get_project_components(project_uuid: str, cache: Dict[str, List[Dict]] = Non
 
         # Process first page
         try:
-            data = response.json()
-        except json.JSONDecodeError:
+            data = _json_loads(response.content)
+        except ValueError:
             print(f"Non-JSON response when getting components for project {project_uuid}: {response.text[:200]}", file=sys.stderr)
             return []
 
@@ -288,13 +407,13 @@ def get_project_components(project_uuid: str, cache: Dict[str, List[Dict]] = Non
             # Fetch remaining pages
             for page_number in range(2, total_pages + 1):
                 params = {'pageNumber': str(page_number), 'pageSize': str(page_size)}
-                response = requests.get(base_url, headers=HEADERS, params=params, timeout=30)
+                response = SESSION.get(base_url, params=params, timeout=30)
                 check_and_exit_on_error(response, f"getting components for project {project_uuid} page {page_number}")
                 response.raise_for_status()
 
                 try:
-                    data = response.json()
-                except json.JSONDecodeError:
+                    data = _json_loads(response.content)
+                except ValueError:
                     print(f"Non-JSON response when getting components for project {project_uuid} page {page_number}: {response.text[:200]}", file=sys.stderr)
                     continue
 
@@ -312,13 +431,13 @@ def get_project_components(project_uuid: str, cache: Dict[str, List[Dict]] = Non
                 while True:
                     page_number += 1
                     params = {'pageNumber': str(page_number), 'pageSize': str(page_size)}
-                    response = requests.get(base_url, headers=HEADERS, params=params, timeout=30)
+                    response = SESSION.get(base_url, params=params, timeout=30)
                     check_and_exit_on_error(response, f"getting components for project {project_uuid} page {page_number}")
                     response.raise_for_status()
 
                     try:
-                        data = response.json()
-                    except json.JSONDecodeError:
+                        data = _json_loads(response.content)
+                    except ValueError:
                         print(f"Non-JSON response when getting components for project {project_uuid} page {page_number}: {response.text[:200]}", file=sys.stderr)
                         break
 
@@ -337,67 +456,202 @@ def get_project_components(project_uuid: str, cache: Dict[str, List[Dict]] = Non
                     if len(page_components) < page_size:
                         break
 
+        # Project down to (name, version) pairs before caching/returning
+        slim_components = [(c.get('name', ''), c.get('version', '')) for c in all_components if c]
+
         # Store in cache (only if caching is enabled)
         if ENABLE_CACHE and cache is not None:
-            cache[project_uuid] = all_components
+            with _CACHE_LOCK:
+                cache[project_uuid] = slim_components
+                _cache_dirty = True
 
-        return all_components
+        return slim_components
     except requests.exceptions.RequestException as e:
         if hasattr(e, 'response') and e.response.status_code == 404:
             components = []
             if ENABLE_CACHE and cache is not None:
-                cache[project_uuid] = components
+                with _CACHE_LOCK:
+                    cache[project_uuid] = components
+                    _cache_dirty = True
             return components
         print(f"Error getting components for project {project_uuid}: {e}", file=sys.stderr)
         return []
 
 
-def match_component_against_packages(component_name: str, component_version: str, packages_lookup: Dict[str, Dict]) -> Dict[str, List[str]]:
-    """
-    Match a component against all packages in the CSV lookup.
-    Returns: {
-        'any_version': [list of package names that match],
-        'exact_version': [list of package names with exact version match],
-        'major_version': [list of package names with major version match]
-    }
-    """
-    matches = {
-        'any_version': [],
-        'exact_version': [],
-        'major_version': []
-    }
+# Shared miss result so memoized misses cost no allocation and can be
+# filtered with an identity check
+_NO_MATCH = (False, False, False)
 
-    if component_name not in packages_lookup:
-        return matches
 
-    package_info = packages_lookup[component_name]
-    malicious_versions = package_info['malicious_versions']
-    major_version = package_info['major_version']
-    all_versions_malicious = package_info.get('all_versions_malicious', False)
+def _compute_match(comp_name: str, comp_version: str, packages_lookup: Dict[str, PkgMatch]) -> Tuple[bool, bool, bool]:
+    """Compute (any, exact, major) match flags for a component name/version."""
+    pkg_info = packages_lookup.get(comp_name)
+    if pkg_info is None:
+        return _NO_MATCH
 
-    # Any version match
-    matches['any_version'].append(component_name)
-
-    # If all versions are malicious, any version matches for exact and major
-    if all_versions_malicious:
-        matches['exact_version'].append(component_name)
-        if component_version:  # If component has a version, it matches
-            matches['major_version'].append(component_name)
+    exact_match = False
+    major_match = False
+    if pkg_info.all_versions_malicious:
+        # If all versions are malicious, any version matches for exact and major
+        exact_match = True
+        if comp_version:  # If component has a version, it matches
+            major_match = True
     else:
         # Strip 'v' prefix if present for comparison
-        comp_version_clean = component_version.lstrip('vV') if component_version else ""
+        comp_version_clean = comp_version.lstrip('vV') if comp_version else ""
 
         # Check exact version match
-        if comp_version_clean in malicious_versions or component_version in malicious_versions:
-            matches['exact_version'].append(component_name)
+        malicious_versions = pkg_info.malicious_versions_set
+        if comp_version_clean in malicious_versions or comp_version in malicious_versions:
+            exact_match = True
 
         # Check major version match
+        major_version = pkg_info.major_version
         if major_version and comp_version_clean:
             version_parts = comp_version_clean.split(".")
             if version_parts and version_parts[0] == major_version:
-                matches['major_version'].append(component_name)
+                major_match = True
+
+    return (True, exact_match, major_match)
+
 
-    return matches
+def build_summary(package_stats: Dict, current_idx: int, total_projects: int) -> Dict:
+    """Build the small progress summary written at each checkpoint."""
+    packages_with_projects = 0
+    projects_any = set()
+    projects_exact = set()
+    projects_major = set()
+    for pkg_stats in package_stats.values():
+        if pkg_stats['projects_any_version']:
+            packages_with_projects += 1
+            projects_any.update(pkg_stats['projects_any_version'])
+            projects_exact.update(pkg_stats['projects_exact_version'])
+            projects_major.update(pkg_stats['projects_major_version'])
+
+    return {
+        'total_packages': len(package_stats),
+        'projects_processed': current_idx,
+        'total_projects': total_projects,
+        'packages_with_projects': packages_with_projects,
+        'projects_any_version': len(projects_any),
+        'projects_exact_version': len(projects_exact),
+        'projects_major_version': len(projects_major)
+    }
+
+
+def save_summary(summary: Dict):
+    """Write the progress summary to summary.json (a few hundred bytes)."""
+    summary_file = os.path.join(OUTPUT_DIR, 'summary.json')
+    try:
+        with open(summary_file, 'wb') as f:
+            f.write(_json_dumps(summary))
+    except IOError as e:
+        print(f"Error saving summary: {e}", file=sys.stderr)
+
+
+def _save_checkpoint(summary: Dict, cache: Dict[str, List]):
+    """Write a summary/cache checkpoint (runs on the background saver thread)."""
+    save_summary(summary)
+    save_cache(cache)
+
+
+def get_components_by_identity(package_name: str) -> List[Dict]:
+    """Get all components matching a package name via the identity API, handling pagination."""
+    base_url = urljoin(DT_BASE_URL, "/api/v1/component/identity")
+    all_components = []
+    page_size = 1000
+    page_number = 0
+
+    try:
+        while True:
+            page_number += 1
+            params = {'name': package_name, 'pageNumber': str(page_number), 'pageSize': str(page_size)}
+            response = SESSION.get(base_url, params=params, timeout=30)
+            check_and_exit_on_error(response, f"searching components named {package_name}")
+
+            if response.status_code == 404:
+                break
+            response.raise_for_status()
+
+            try:
+                data = _json_loads(response.content)
+            except ValueError:
+                print(f"Non-JSON response when searching components named {package_name}: {response.text[:200]}", file=sys.stderr)
+                break
+
+            page_components = []
+            if isinstance(data, list):
+                page_components = data
+            elif isinstance(data, dict) and 'items' in data:
+                page_components = data['items']
+
+            if not page_components:
+                break
+
+            all_components.extend(page_components)
+
+            # If we got less than page_size, we're on the last page
+            if len(page_components) < page_size:
+                break
+
+        return all_components
+    except requests.exceptions.RequestException as e:
+        print(f"Error searching components named {package_name}: {e}", file=sys.stderr)
+        return []
+
+
+def analyze_serverside(packages_lookup: Dict[str, PkgMatch], package_stats: Dict, results_log_path: str):
+    """
+    Flip the loop: query the identity API once per malicious package instead
+    of fetching every component of every project, so only the (rare) matches
+    are transferred instead of whole SBOMs. The identity search is a SQL LIKE
+    on the name, so hits are re-checked for an exact name match.
+    """
+    total = len(packages_lookup)
+    print(f"Querying the identity API for {total} packages (server-side matching)...")
+
+    with open(results_log_path, 'wb') as results_log, \
+            ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+        component_results = executor.map(get_components_by_identity, packages_lookup)
+
+        for idx, (package_name, components) in enumerate(zip(packages_lookup, component_results), 1):
+            # Progress indicator
+            if idx % 5 == 0 or idx == 1:
+                print(f"[{idx}/{total}] Searching for package: {package_name[:60]}...", end='\r', flush=True)
+
+            pkg_stats = package_stats[package_name]
+            for component in components:
+                if not component or component.get('name') != package_name:
+                    continue
+
+                project = component.get('project') or {}
+                project_uuid = project.get('uuid')
+                if not project_uuid:
+                    continue
+                project_name = project.get('name', 'Unknown')
+                comp_version = component.get('version', '')
+
+                _, exact_match, major_match = _compute_match(package_name, comp_version, packages_lookup)
+
+                # Update statistics (store UUID -> {name, version})
+                entry = {'name': project_name, 'version': comp_version}
+                pkg_stats['projects_any_version'][project_uuid] = entry
+                if exact_match:
+                    pkg_stats['projects_exact_version'][project_uuid] = entry
+                if major_match:
+                    pkg_stats['projects_major_version'][project_uuid] = entry
+
+                # Log the match event incrementally
+                results_log.write(_jsonl_dumps({
+                    'project': project_uuid,
+                    'project_name': project_name,
+                    'package': package_name,
+                    'version': comp_version,
+                    'exact': exact_match,
+                    'major': major_match
+                }))
+
+    print(f"\nCompleted identity queries for {total} packages" + " " * 50)
 
 
 def main():
@@ -418,8 +672,9 @@ def main():
         print("Continuing with CSV data only...")
         json_packages = {}
 
-    # Build a lookup dictionary: package_name -> {version_str, malicious_versions, major_version}
-    packages_lookup = {}
+    # Build a metadata dictionary: package_name -> {version_str, malicious_versions, major_version}
+    # (used for reporting; the hot-path match state is built separately below)
+    packages_meta = {}
 
     # Process CSV packages
     csv_count = 0
@@ -431,7 +686,7 @@ def main():
             continue
 
         major_version, malicious_versions = parse_version(version_str)
-        packages_lookup[package_name] = {
+        packages_meta[package_name] = {
             'version_str': version_str,
             'malicious_versions': malicious_versions,
             'major_version': major_version,
@@ -449,8 +704,8 @@ def main():
         versions = package_data.get('versions', [])
 
         # If package already exists from CSV, merge versions
-        if package_name in packages_lookup:
-            existing_versions = set(packages_lookup[package_name]['malicious_versions'])
+        if package_name in packages_meta:
+            existing_versions = set(packages_meta[package_name]['malicious_versions'])
             new_versions = set(versions)
             all_versions = sorted(list(existing_versions | new_versions))
 
@@ -459,7 +714,7 @@ def main():
 
             # Rebuild version_str and major_version
             if all_versions_malicious:
-                version_str = packages_lookup[package_name]['version_str'] + " || ALL VERSIONS"
+                version_str = packages_meta[package_name]['version_str'] + " || ALL VERSIONS"
             else:
                 version_str = ' || '.join([f"= {v}" for v in all_versions])
 
@@ -470,7 +725,7 @@ def main():
                 if parts:
                     major_version = parts[0]
 
-            packages_lookup[package_name] = {
+            packages_meta[package_name] = {
                 'version_str': version_str,
                 'malicious_versions': all_versions,
                 'major_version': major_version,
@@ -489,7 +744,7 @@ def main():
                 if parts:
                     major_version = parts[0]
 
-            packages_lookup[package_name] = {
+            packages_meta[package_name] = {
                 'version_str': version_str,
                 'malicious_versions': versions,
                 'major_version': major_version,
@@ -498,6 +753,13 @@ def main():
             }
             json_count += 1
 
+    # Hot-path lookup: package_name -> PkgMatch with only the fields the
+    # per-component match reads (AoS -> SoA-style split from packages_meta)
+    packages_lookup = {
+        name: PkgMatch(meta['major_version'], meta['all_versions_malicious'], frozenset(meta['malicious_versions']))
+        for name, meta in packages_meta.items()
+    }
+
     print(f"\nLoaded {csv_count} packages from CSV, {json_count} new packages from JSON")
     print(f"Total unique packages: {len(packages_lookup)}\n")
 
@@ -508,83 +770,125 @@ def main():
         'projects_major_version': {}  # uuid -> {'name': ..., 'version': ...}
     } for pkg in packages_lookup.keys()}
 
-    # Load cache
-    cache = load_cache()
+    # Load cache (only used by the per-project fetch path)
+    cache = load_cache() if not SERVER_SIDE_MATCHING else {}
 
-    # Get all projects
-    print("Fetching all projects from DependencyTrack...")
-    all_projects = get_all_projects()
+    # Append-only log of match events: constant cost per match, instead of
+    # re-serializing the whole growing results structure every checkpoint
+    results_log_path = os.path.join(OUTPUT_DIR, 'results.jsonl')
 
-    # Limit to first 10 projects for testing
-    TEST_MODE = False
-    if TEST_MODE:
-        all_projects = all_projects[:10]
-        print(f"TEST MODE: Processing only first 10 projects (out of {len(get_all_projects())} total)\n")
+    if SERVER_SIDE_MATCHING:
+        # Let the server find matching components per package name instead
+        # of pulling every project's full component list
+        analyze_serverside(packages_lookup, package_stats, results_log_path)
+        all_projects = []  # project list is never fetched in this mode
     else:
-        print(f"Found {len(all_projects)} projects to analyze\n")
+        # Single background worker for checkpoint writes, so serializing the
+        # results and cache overlaps with the next projects' network fetches
+        saver = ThreadPoolExecutor(max_workers=1)
+        pending_save = None
+
+        # Get all projects
+        print("Fetching all projects from DependencyTrack...")
+        all_projects = get_all_projects()
+
+        # Limit to first 10 projects for testing
+        TEST_MODE = False
+        total_projects_count = len(all_projects)
+        if TEST_MODE:
+            all_projects = all_projects[:10]
+            print(f"TEST MODE: Processing only first 10 projects (out of {total_projects_count} total)\n")
+        else:
+            print(f"Found {len(all_projects)} projects to analyze\n")
 
 
-    # Process each project: get components once, match against all packages
-    for idx, project in enumerate(all_projects, 1):
-        project_uuid = project.get('uuid')
-        project_name = project.get('name', 'Unknown')
+        # Memoized match results keyed by (name, version)
+        match_memo: Dict[Tuple[str, str], Tuple[bool, bool, bool]] = {}
 
-        if not project_uuid:
-            continue
+        # Process each project: fetch components concurrently (network-bound),
+        # match against all packages in the main thread as results come in order
+        with open(results_log_path, 'wb') as results_log, \
+                ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            component_results = executor.map(
+                lambda project: get_project_components(project['uuid'], cache) if project.get('uuid') else [],
+                all_projects
+            )
 
-        # Progress indicator
-        if idx % 5 == 0 or idx == 1:
-            cached = " (cached)" if ENABLE_CACHE and project_uuid in cache else ""
-            print(f"[{idx}/{len(all_projects)}] Processing project: {project_name[:60]}{cached}...", end='\r', flush=True)
-
-        # Get all components for this project (ONCE per project, using cache)
-        components = get_project_components(project_uuid, cache)
-
-        # Match each component against all packages in CSV
-        for component in components:
-            if not component:
-                continue
-
-            comp_name = component.get('name', '')
-            comp_version = component.get('version', '')
-
-            if not comp_name:
-                continue
-
-            # Match this component against all packages
-            matches = match_component_against_packages(comp_name, comp_version, packages_lookup)
-
-            # Update statistics for each matching package (store UUID -> {name, version})
-            for package_name in matches['any_version']:
-                package_stats[package_name]['projects_any_version'][project_uuid] = {
-                    'name': project_name,
-                    'version': comp_version
-                }
-
-            for package_name in matches['exact_version']:
-                package_stats[package_name]['projects_exact_version'][project_uuid] = {
-                    'name': project_name,
-                    'version': comp_version
-                }
-
-            for package_name in matches['major_version']:
-                package_stats[package_name]['projects_major_version'][project_uuid] = {
-                    'name': project_name,
-                    'version': comp_version
-                }
-
-        # Save results and cache incrementally (every 10 projects)
-        if idx % 10 == 0:
-            # Build stats structure for saving
-            stats = build_stats_from_package_stats(package_stats, packages_lookup)
-            save_results(stats, idx, len(all_projects))
-            save_cache(cache)
-            print(f"  💾 Progress saved ({idx}/{len(all_projects)} projects processed)" + " " * 30)
-
-    print(f"\nCompleted processing {len(all_projects)} projects" + " " * 50)
+            for idx, (project, components) in enumerate(zip(all_projects, component_results), 1):
+                project_uuid = project.get('uuid')
+                project_name = project.get('name', 'Unknown')
+
+                if not project_uuid:
+                    continue
+
+                # Progress indicator
+                if idx % 5 == 0 or idx == 1:
+                    cached = " (cached)" if ENABLE_CACHE and project_uuid in cache else ""
+                    print(f"[{idx}/{len(all_projects)}] Processing project: {project_name[:60]}{cached}...", end='\r', flush=True)
+
+                # Match each component against all packages in CSV
+                for component in components:
+                    if not component:
+                        continue
+
+                    # (name, version) pairs; cached entries come back as lists
+                    comp_name, comp_version = component
+
+                    if not comp_name:
+                        continue
+
+                    # Match this component, memoized per (name, version): the
+                    # same pair recurs across many projects, so the lstrip/split
+                    # work runs once per distinct component instead of per use
+                    key = (comp_name, comp_version)
+                    matched = match_memo.get(key)
+                    if matched is None:
+                        matched = _compute_match(comp_name, comp_version, packages_lookup)
+                        match_memo[key] = matched
+                    if matched is _NO_MATCH:
+                        continue
+                    _, exact_match, major_match = matched
+
+                    # Update statistics for the matching package (store UUID -> {name, version})
+                    entry = {'name': project_name, 'version': comp_version}
+                    pkg_stats = package_stats[comp_name]
+                    pkg_stats['projects_any_version'][project_uuid] = entry
+                    if exact_match:
+                        pkg_stats['projects_exact_version'][project_uuid] = entry
+                    if major_match:
+                        pkg_stats['projects_major_version'][project_uuid] = entry
+
+                    # Log the match event incrementally
+                    results_log.write(_jsonl_dumps({
+                        'project': project_uuid,
+                        'project_name': project_name,
+                        'package': comp_name,
+                        'version': comp_version,
+                        'exact': exact_match,
+                        'major': major_match
+                    }))
+
+                # Checkpoint every 10 projects: flush the match log, refresh
+                # the small summary.json and save the cache in the background
+                # (the full results JSON is only written once, at the end -
+                # matches are already on disk in the log)
+                if idx % 10 == 0:
+                    if pending_save is not None:
+                        pending_save.result()
+                    results_log.flush()
+                    summary = build_summary(package_stats, idx, len(all_projects))
+                    pending_save = saver.submit(_save_checkpoint, summary, cache)
+                    print(f"  💾 Progress saved ({idx}/{len(all_projects)} projects processed)" + " " * 30)
+
+        print(f"\nCompleted processing {len(all_projects)} projects" + " " * 50)
+
+        # Wait for any in-flight checkpoint before the final save
+        if pending_save is not None:
+            pending_save.result()
+        saver.shutdown(wait=True)
 
     # Build final statistics
-    stats = build_stats_from_package_stats(package_stats, packages_lookup)
+    stats = build_stats_from_package_stats(package_stats, packages_meta)
 
     # Final save
     save_results(stats, len(all_projects), len(all_projects), final=True)
@@ -611,8 +915,8 @@ def main():
     tricon_projects_major = set()
 
     for pkg_detail in stats['package_details']:
-        source = pkg_detail.get('source', 'Unknown')
-        pkg_name = pkg_detail['package']
+        source = pkg_detail.source
+        pkg_name = pkg_detail.package
 
         # Track packages by source
         if source == 'CSV' or source == 'CSV+JSON':
@@ -621,22 +925,19 @@ def main():
             tricon_packages.add(pkg_name)
 
         # Track projects by source
-        for proj in pkg_detail['projects_any_version']['projects']:
-            proj_uuid = proj['uuid']
+        for proj_uuid, _, _ in pkg_detail.projects_any_version['projects']:
             if source == 'CSV' or source == 'CSV+JSON':
                 wiz_projects_any.add(proj_uuid)
             if source == 'JSON' or source == 'CSV+JSON':
                 tricon_projects_any.add(proj_uuid)
 
-        for proj in pkg_detail['projects_exact_version']['projects']:
-            proj_uuid = proj['uuid']
+        for proj_uuid, _, _ in (pkg_detail.projects_exact_version or _EMPTY_BUCKET)['projects']:
             if source == 'CSV' or source == 'CSV+JSON':
                 wiz_projects_exact.add(proj_uuid)
             if source == 'JSON' or source == 'CSV+JSON':
                 tricon_projects_exact.add(proj_uuid)
 
-        for proj in pkg_detail['projects_major_version']['projects']:
-            proj_uuid = proj['uuid']
+        for proj_uuid, _, _ in (pkg_detail.projects_major_version or _EMPTY_BUCKET)['projects']:
             if source == 'CSV' or source == 'CSV+JSON':
                 wiz_projects_major.add(proj_uuid)
             if source == 'JSON' or source == 'CSV+JSON':
@@ -665,14 +966,14 @@ def main():
         print(f"{'Package':<40} {'Source':<12} {'Any Ver':<10} {'Exact Ver':<12} {'Major Ver':<12}")
         print("-" * 100)
 
-        for pkg_detail in sorted(stats['package_details'], key=lambda x: x['projects_any_version']['count'], reverse=True):
-            pkg_name = pkg_detail['package']
-            any_count = pkg_detail['projects_any_version']['count']
-            exact_count = pkg_detail['projects_exact_version']['count']
-            major_count = pkg_detail['projects_major_version']['count']
+        for pkg_detail in sorted(stats['package_details'], key=lambda x: x.projects_any_version['count'], reverse=True):
+            pkg_name = pkg_detail.package
+            any_count = pkg_detail.projects_any_version['count']
+            exact_count = (pkg_detail.projects_exact_version or _EMPTY_BUCKET)['count']
+            major_count = (pkg_detail.projects_major_version or _EMPTY_BUCKET)['count']
 
             # Get source indicator
-            source = pkg_detail.get('source', 'Unknown')
+            source = pkg_detail.source
             if source == 'CSV':
                 source_indicator = "[WIZ]"
             elif source == 'JSON':
@@ -683,8 +984,8 @@ def main():
                 source_indicator = "[?]"
 
             # Get malicious versions
-            malicious_versions = pkg_detail['malicious_versions']
-            if pkg_detail.get('all_versions_malicious', False):
+            malicious_versions = pkg_detail.malicious_versions
+            if pkg_detail.all_versions_malicious:
                 malicious_versions_str = "ALL VERSIONS"
             elif malicious_versions:
                 malicious_versions_str = ", ".join(malicious_versions[:3])
@@ -695,8 +996,8 @@ def main():
 
             # Get project names with versions used
             project_info_list = []
-            for p in pkg_detail['projects_any_version']['projects']:
-                project_info_list.append(f"{p['name']} (v{p['version']})")
+            for _, proj_name, proj_version in pkg_detail.projects_any_version['projects']:
+                project_info_list.append(f"{proj_name} (v{proj_version})")
 
             if len(project_info_list) <= 2:
                 projects_str = ", ".join(project_info_list)
@@ -713,51 +1014,77 @@ def main():
         print("="*80)
 
         # Group by project
-        projects_affected = {}
+        projects_affected = defaultdict(lambda: {'name': None, 'packages': []})
         for pkg_detail in stats['package_details']:
-            for proj in pkg_detail['projects_any_version']['projects']:
-                proj_uuid = proj['uuid']
-                proj_name = proj['name']
-                if proj_uuid not in projects_affected:
-                    projects_affected[proj_uuid] = {
-                        'name': proj_name,
-                        'packages': []
-                    }
-                projects_affected[proj_uuid]['packages'].append(pkg_detail['package'])
+            for proj_uuid, proj_name, _ in pkg_detail.projects_any_version['projects']:
+                entry = projects_affected[proj_uuid]
+                entry['name'] = proj_name
+                entry['packages'].append(pkg_detail.package)
+
+        # Index package details by name once instead of scanning the list
+        # for every (project, package) pair below
+        pkg_detail_by_name = {p.package: p for p in stats['package_details']}
+
+        # Precompute uuid sets per package so the match checks below are
+        # O(1) membership tests instead of list scans per project
+        exact_uuids_by_pkg = {p.package: {proj[0] for proj in (p.projects_exact_version or _EMPTY_BUCKET)['projects']}
+                              for p in stats['package_details']}
+        major_uuids_by_pkg = {p.package: {proj[0] for proj in (p.projects_major_version or _EMPTY_BUCKET)['projects']}
+                              for p in stats['package_details']}
+
+        # Same idea for version lookups: uuid -> version per package, so
+        # finding a project's version is a dict lookup rather than a scan
+        # of the package's full projects list
+        version_by_uuid_by_pkg = {p.package: {u: v for u, _, v in p.projects_any_version['projects']}
+                                  for p in stats['package_details']}
+
+        # The same package shows up under many projects below; build the
+        # invariant pieces of its printed line once here instead of
+        # re-deriving them for every (project, package) pair
+        prefix_by_pkg = {}
+        mal_suffix_by_pkg = {}
+        for p in stats['package_details']:
+            source = p.source
+            if source == 'CSV':
+                source_indicator = "[WIZ]"
+            elif source == 'JSON':
+                source_indicator = "[TRICON]"
+            elif source == 'CSV+JSON':
+                source_indicator = "[WIZ+TRICON]"
+            else:
+                source_indicator = "[?]"
+
+            malicious_versions = p.malicious_versions
+            if p.all_versions_malicious:
+                malicious_str = "ALL VERSIONS"
+            elif malicious_versions:
+                malicious_str = ", ".join(malicious_versions)
+            else:
+                malicious_str = "N/A"
 
+            prefix_by_pkg[p.package] = f"  - {source_indicator} {p.package}"
+            mal_suffix_by_pkg[p.package] = f"malicious: {malicious_str}"
+
+        # Collect the report lines and emit them in a single write: per-line
+        # print() pays a call plus a stdout lock round-trip each time, which
+        # adds up for projects with many packages
+        lines = []
+        add = lines.append
         for proj_uuid, proj_info in sorted(projects_affected.items(), key=lambda x: len(x[1]['packages']), reverse=True):
-            print(f"\n{proj_info['name']} ({len(proj_info['packages'])} malicious package(s)):")
+            add(f"\n{proj_info['name']} ({len(proj_info['packages'])} malicious package(s)):")
             for pkg_name in proj_info['packages']:
                 # Find the package detail to get version info
-                pkg_detail = next((p for p in stats['package_details'] if p['package'] == pkg_name), None)
+                pkg_detail = pkg_detail_by_name.get(pkg_name)
                 if pkg_detail:
-                    # Get source indicator
-                    source = pkg_detail.get('source', 'Unknown')
-                    if source == 'CSV':
-                        source_indicator = "[WIZ]"
-                    elif source == 'JSON':
-                        source_indicator = "[TRICON]"
-                    elif source == 'CSV+JSON':
-                        source_indicator = "[WIZ+TRICON]"
-                    else:
-                        source_indicator = "[?]"
+                    prefix = prefix_by_pkg[pkg_name]
 
                     # Find this project's version usage
-                    proj_usage = next((p for p in pkg_detail['projects_any_version']['projects'] if p['uuid'] == proj_uuid), None)
-                    if proj_usage:
-                        version_used = proj_usage.get('version', 'unknown')
-                        malicious_versions = pkg_detail['malicious_versions']
-                        if pkg_detail.get('all_versions_malicious', False):
-                            malicious_str = "ALL VERSIONS"
-                        elif malicious_versions:
-                            malicious_str = ", ".join(malicious_versions)
-                        else:
-                            malicious_str = "N/A"
-
+                    version_used = version_by_uuid_by_pkg[pkg_name].get(proj_uuid)
+                    if version_used is not None:
                         # Check for exact match
-                        exact_match = any(p['uuid'] == proj_uuid for p in pkg_detail['projects_exact_version']['projects'])
+                        exact_match = proj_uuid in exact_uuids_by_pkg[pkg_name]
                         # Check for major version match (close match)
-                        major_match = any(p['uuid'] == proj_uuid for p in pkg_detail['projects_major_version']['projects'])
+                        major_match = proj_uuid in major_uuids_by_pkg[pkg_name]
 
                         match_indicator = ""
                         if exact_match:
@@ -765,65 +1092,95 @@ def main():
                         elif major_match:
                             match_indicator = " [CLOSE_MATCH]"
 
-                        print(f"  - {source_indicator} {pkg_name} (using v{version_used}, malicious: {malicious_str}){match_indicator}")
+                        add(f"{prefix} (using v{version_used}, {mal_suffix_by_pkg[pkg_name]}){match_indicator}")
                     else:
-                        print(f"  - {source_indicator} {pkg_name}")
+                        add(prefix)
                 else:
-                    print(f"  - {pkg_name}")
+                    add(f"  - {pkg_name}")
 
-    print("\nResults saved to: analysis_results.json and projects_list.json")
+        sys.stdout.write('\n'.join(lines))
+        sys.stdout.write('\n')
 
+    print("\nResults saved to: analysis_results.json, projects_list.json and results.jsonl")
 
-def build_stats_from_package_stats(package_stats: Dict, packages_lookup: Dict) -> Dict:
+
+def _collect_projects(version_dict: Dict, totals: Dict[str, str]) -> List[Tuple[str, str, str]]:
+    """
+    Shape a uuid -> {name, version} dict into a list of (uuid, name, version)
+    tuples, accumulating uuid -> name into totals in the same pass.
+
+    Tuples instead of per-project dicts: three string keys per project add up
+    to far more than the payload across tens of thousands of projects. The
+    dict form is only materialized at serialization time in save_results.
+    """
+    projects = []
+    append = projects.append
+    intern = sys.intern
+    for u, i in version_dict.items():
+        # Project names repeat across packages and versions collide across
+        # projects; interning dedupes them to one string object each
+        name = intern(i['name'])
+        append((u, name, intern(i['version'])))
+        totals[u] = name
+    return projects
+
+
+def build_stats_from_package_stats(package_stats: Dict[str, Dict], packages_meta: Dict[str, Dict]) -> Dict:
     """Build the stats structure from package_stats for saving."""
-    total_projects_any_version = {}  # uuid -> name
-    total_projects_exact_version = {}  # uuid -> name
-    total_projects_major_version = {}  # uuid -> name
+    total_projects_any_version: Dict[str, str] = {}  # uuid -> name
+    total_projects_exact_version: Dict[str, str] = {}  # uuid -> name
+    total_projects_major_version: Dict[str, str] = {}  # uuid -> name
     packages_with_projects = 0
-    package_details = []
+    package_details: List[PackageDetail] = []
+    # Bind the bound method once; the loop below runs per package
+    pd_append = package_details.append
 
     for package_name, pkg_stats in package_stats.items():
         any_version_dict = pkg_stats['projects_any_version']  # uuid -> {name, version}
+        # Most packages have no matching projects at all; bail out before
+        # touching the other buckets
+        if not any_version_dict:
+            continue
+
         exact_version_dict = pkg_stats['projects_exact_version']  # uuid -> {name, version}
         major_version_dict = pkg_stats['projects_major_version']  # uuid -> {name, version}
 
-        if any_version_dict:
-            packages_with_projects += 1
-            # Update total projects (extract names)
-            total_projects_any_version.update({uuid: info['name'] for uuid, info in any_version_dict.items()})
-            total_projects_exact_version.update({uuid: info['name'] for uuid, info in exact_version_dict.items()})
-            total_projects_major_version.update({uuid: info['name'] for uuid, info in major_version_dict.items()})
-
-            package_info = packages_lookup[package_name]
-
-            # Build project lists with names and versions
-            projects_any = [{'uuid': uuid, 'name': info['name'], 'version': info['version']} for uuid, info in any_version_dict.items()]
-            projects_exact = [{'uuid': uuid, 'name': info['name'], 'version': info['version']} for uuid, info in exact_version_dict.items()]
-            projects_major = [{'uuid': uuid, 'name': info['name'], 'version': info['version']} for uuid, info in major_version_dict.items()]
-
-            package_details.append({
-                'package': package_name,
-                'version': package_info['version_str'],
-                'major_version': package_info['major_version'],
-                'malicious_versions': package_info['malicious_versions'],
-                'all_versions_malicious': package_info.get('all_versions_malicious', False),
-                'source': package_info.get('source', 'Unknown'),
-                'projects_any_version': {
-                    'count': len(any_version_dict),
-                    'projects': projects_any
-                },
-                'projects_exact_version': {
-                    'count': len(exact_version_dict),
-                    'projects': projects_exact
-                },
-                'projects_major_version': {
-                    'count': len(major_version_dict),
-                    'projects': projects_major
-                }
-            })
+        packages_with_projects += 1
+
+        package_info = packages_meta[package_name]
+
+        # Build project lists with names and versions, accumulating the
+        # total-projects dicts in the same pass over each dict
+        projects_any = _collect_projects(any_version_dict, total_projects_any_version)
+        projects_exact = _collect_projects(exact_version_dict, total_projects_exact_version)
+        projects_major = _collect_projects(major_version_dict, total_projects_major_version)
+
+        # Empty exact/major buckets are the common case; None keeps the
+        # structure (and, after omission in save_results, the JSON
+        # output) smaller. Consumers read them with `or _EMPTY_BUCKET`.
+        pd_append(PackageDetail(
+            package=package_name,
+            version=package_info['version_str'],
+            major_version=package_info['major_version'],
+            malicious_versions=package_info['malicious_versions'],
+            all_versions_malicious=package_info.get('all_versions_malicious', False),
+            source=sys.intern(package_info.get('source', 'Unknown')),
+            projects_any_version={
+                'count': len(any_version_dict),
+                'projects': projects_any
+            },
+            projects_exact_version={
+                'count': len(exact_version_dict),
+                'projects': projects_exact
+            } if exact_version_dict else None,
+            projects_major_version={
+                'count': len(major_version_dict),
+                'projects': projects_major
+            } if major_version_dict else None
+        ))
 
     return {
-        'total_packages': len(packages_lookup),
+        'total_packages': len(packages_meta),
         'packages_with_projects': packages_with_projects,
         'total_projects_any_version': total_projects_any_version,
         'total_projects_exact_version': total_projects_exact_version,
@@ -832,10 +1189,41 @@ def build_stats_from_package_stats(package_stats: Dict, packages_lookup: Dict) -
     }
 
 
+def _write_json_atomic(path: str, data: bytes):
+    """
+    Write bytes to a temp file and rename into place, so a crash mid-write
+    can't leave a truncated JSON file behind. The large buffer keeps the
+    multi-MB results dump to a handful of write syscalls.
+    """
+    tmp = path + '.tmp'
+    with open(tmp, 'wb', buffering=1 << 20) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _bucket_to_json(bucket: Dict) -> Dict:
+    """Expand a bucket's (uuid, name, version) tuples into JSON-ready dicts."""
+    return {
+        'count': bucket['count'],
+        'projects': [{'uuid': u, 'name': n, 'version': v} for u, n, v in bucket['projects']]
+    }
+
+
 def save_results(stats: Dict, current_idx: int, total_projects: int, final: bool = False):
     """Save results incrementally to JSON files."""
-    # Use /app/output if it exists (Docker volume mount), otherwise current directory
-    output_dir = '/app/output' if os.path.exists('/app/output') else '.'
+    # Internal records are compact tuples (PackageDetail and the per-project
+    # triples inside its buckets); expand them to the documented dict output
+    # format only here (empty exact/major buckets are omitted entirely)
+    package_details = []
+    for detail in stats['package_details']:
+        out = detail._asdict()
+        out['projects_any_version'] = _bucket_to_json(out['projects_any_version'])
+        for key in ('projects_exact_version', 'projects_major_version'):
+            if out[key] is None:
+                del out[key]
+            else:
+                out[key] = _bucket_to_json(out[key])
+        package_details.append(out)
 
     # Save detailed results to JSON
     output_data = {
@@ -847,12 +1235,14 @@ def save_results(stats: Dict, current_idx: int, total_projects: int, final: bool
             'projects_exact_version': len(stats['total_projects_exact_version']),
             'projects_major_version': len(stats['total_projects_major_version'])
         },
-        'package_details': stats['package_details']
+        'package_details': package_details
     }
 
-    output_file = os.path.join(output_dir, 'analysis_results.json')
-    with open(output_file, 'w') as f:
-        json.dump(output_data, f, indent=2)
+    output_file = os.path.join(OUTPUT_DIR, 'analysis_results.json')
+    # _json_dumps uses orjson when available: stdlib json falls back to its
+    # pure-Python pretty printer when indent is set, a 2-5x slowdown on the
+    # large nested package_details structure
+    _write_json_atomic(output_file, _json_dumps(output_data))
 
     # Save project lists
     # Build projects output with names
@@ -862,9 +1252,8 @@ def save_results(stats: Dict, current_idx: int, total_projects: int, final: bool
         'projects_major_version': [{'uuid': uuid, 'name': name} for uuid, name in stats['total_projects_major_version'].items()]
     }
 
-    projects_file = os.path.join(output_dir, 'projects_list.json')
-    with open(projects_file, 'w') as f:
-        json.dump(projects_output, f, indent=2)
+    projects_file = os.path.join(OUTPUT_DIR, 'projects_list.json')
+    _write_json_atomic(projects_file, _json_dumps(projects_output))
 
     if not final:
         print(f"  💾 Progress saved ({current_idx}/{total_projects} projects processed)")